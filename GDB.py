@@ -1,6 +1,14 @@
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-import altair as alt
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; NumPy fallbacks are used instead
+    njit = None
 
 # ---------- APP CONFIG ----------
 st.set_page_config(
@@ -9,39 +17,204 @@ st.set_page_config(
     layout="wide"
 )
 
+# ---------- CHART SPECS ----------
+# Plain Vega-Lite specs; data is supplied at render time via st.vega_lite_chart
+BUDGET_AXIS = {"field": "Budget", "type": "quantitative", "title": "Budget (₹ Crores)"}
+BUDGET_TOOLTIP = {"field": "Budget", "type": "quantitative", "format": ",.0f"}
+YEAR_AXIS = {"field": "Year", "type": "ordinal"}
+
+YEAR_LINE_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": YEAR_AXIS,
+        "y": BUDGET_AXIS,
+        "tooltip": [{"field": "Year", "type": "ordinal"}, BUDGET_TOOLTIP],
+    },
+    "height": 350,
+}
+
+YEAR_BAR_SPEC = {
+    "mark": {"type": "bar"},
+    "encoding": YEAR_LINE_SPEC["encoding"],
+    "height": 350,
+}
+
+TOP5_BAR_SPEC = {
+    "mark": {"type": "bar"},
+    "encoding": {
+        "x": BUDGET_AXIS,
+        "y": {"field": "Department", "type": "nominal", "sort": "-x"},
+        "tooltip": [{"field": "Department", "type": "nominal"}, BUDGET_TOOLTIP],
+    },
+    "height": 300,
+}
+
+COMPARE_LINE_SPEC = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": YEAR_AXIS,
+        "y": BUDGET_AXIS,
+        "color": {"field": "Department", "type": "nominal"},
+        "tooltip": [
+            {"field": "Department", "type": "nominal"},
+            {"field": "Year", "type": "ordinal"},
+            BUDGET_TOOLTIP,
+        ],
+    },
+    "height": 400,
+}
+
+# ---------- NUMERIC KERNELS ----------
+# NaN cells are skipped, matching np.nansum / the old dropna behaviour.
+if njit is not None:
+    @njit(cache=True)
+    def col_sums(mat, lo_idx, hi_idx):
+        """Sum each of the year columns lo_idx..hi_idx, ignoring NaN."""
+        out = np.zeros(hi_idx - lo_idx + 1)
+        for i in range(mat.shape[0]):
+            for j in range(lo_idx, hi_idx + 1):
+                v = mat[i, j]
+                if not np.isnan(v):
+                    out[j - lo_idx] += v
+        return out
+
+    @njit(cache=True)
+    def topk_indices(vec, k):
+        """Indices of the k largest non-NaN values, largest first."""
+        idx = np.empty(k, dtype=np.int64)
+        vals = np.empty(k)
+        n = 0
+        for i in range(vec.shape[0]):
+            v = vec[i]
+            if np.isnan(v):
+                continue
+            if n < k:
+                pos = n
+                n += 1
+            elif v > vals[k - 1]:
+                pos = k - 1
+            else:
+                continue
+            while pos > 0 and vals[pos - 1] < v:
+                vals[pos] = vals[pos - 1]
+                idx[pos] = idx[pos - 1]
+                pos -= 1
+            vals[pos] = v
+            idx[pos] = i
+        return idx[:n]
+else:
+    def col_sums(mat, lo_idx, hi_idx):
+        """Sum each of the year columns lo_idx..hi_idx, ignoring NaN."""
+        return np.nansum(mat[:, lo_idx:hi_idx + 1], axis=0)
+
+    def topk_indices(vec, k):
+        """Indices of the k largest non-NaN values, largest first."""
+        filled = np.where(np.isnan(vec), -np.inf, vec)
+        # Largest first, ties broken by earliest row as in the numba kernel
+        idx = np.lexsort((np.arange(len(filled)), -filled))[:k]
+        return idx[np.isfinite(filled[idx])]
+
+
+@st.cache_resource
+def warm_up_kernels():
+    """Compile the numeric kernels once per server process."""
+    sample = np.zeros((2, 2))
+    col_sums(sample, 0, 1)
+    topk_indices(sample[:, 0], 1)
+
+
 # ---------- HELPER FUNCTIONS ----------
-@st.cache_data
+@dataclass(frozen=True)
+class BudgetData:
+    """Parsed budget CSV, shared read-only across reruns and sessions."""
+    df: pd.DataFrame
+    mat: np.ndarray
+    totals: np.ndarray
+    year_cols: list
+    growth: dict
+    dept_rows: dict
+    dept_idx: dict
+    depts_sorted: list
+    years: np.ndarray
+
+
+@st.cache_resource
 def load_data(file):
-    df = pd.read_csv(file)
+    df = pd.read_csv(file, engine="pyarrow", dtype_backend="pyarrow")
     # Ensure first column is Department, rest are years
     df.rename(columns={df.columns[0]: "Department"}, inplace=True)
 
-    # Keep only numeric year columns
-    year_cols = [c for c in df.columns if c != "Department"]
+    # Keep only numeric year columns, in ascending order so a year range
+    # maps to a contiguous slice of the matrix
+    year_cols = sorted((c for c in df.columns if c != "Department"), key=int)
+    years = np.array([int(y) for y in year_cols])
 
-    # Melt into long format: Department | Year | Budget
-    long_df = df.melt(
-        id_vars="Department",
-        value_vars=year_cols,
-        var_name="Year",
-        value_name="Budget"
+    # Dense Department x Year matrix; non-numeric cells become NaN
+    mat = np.ascontiguousarray(
+        df[year_cols]
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=np.float64, na_value=np.nan)
     )
 
-    long_df["Year"] = long_df["Year"].astype(str)
-    long_df["Budget"] = pd.to_numeric(long_df["Budget"], errors="coerce")
-    long_df.dropna(subset=["Budget"], inplace=True)
-    return df, long_df, year_cols
+    # Total budget per year across all departments
+    totals = col_sums(mat, 0, len(year_cols) - 1)
+
+    # Growth from first to last year for every department, computed once
+    starts, ends = mat[:, 0], mat[:, -1]
+    abs_changes = ends - starts
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_changes = np.where(starts != 0, abs_changes / starts * 100, np.nan)
+    growth = dict(zip(df["Department"], zip(starts, ends, abs_changes, pct_changes)))
+
+    # (Year, Budget) rows for each department's data table
+    dept_rows = {
+        dept: list(zip(year_cols, mat[i].tolist()))
+        for i, dept in enumerate(df["Department"])
+    }
+
+    # Department -> matrix row
+    dept_idx = {dept: i for i, dept in enumerate(df["Department"])}
+    depts_sorted = sorted(dept_idx)
+    return BudgetData(
+        df, mat, totals, year_cols, growth, dept_rows, dept_idx, depts_sorted, years
+    )
+
+
+def long_frame(departments, years, values):
+    """Build a long-format Department | Year | Budget frame from a matrix slice."""
+    budget = np.asarray(values).ravel(order="F")
+    keep = ~np.isnan(budget)
+    return pd.DataFrame({
+        "Department": np.tile(np.asarray(departments), len(years))[keep],
+        "Year": np.repeat(np.asarray(years), len(departments))[keep],
+        "Budget": budget[keep],
+    })
+
+
+# Derived aggregates are keyed by the uploaded file's hash and the selected
+# year columns; the leading underscore tells Streamlit not to hash the data.
+@st.cache_data
+def top5_latest(file_hash, _data, col):
+    """Top 5 departments by budget for a single year column."""
+    latest = _data.mat[:, col]
+    idx = topk_indices(latest, 5)
+    return pd.DataFrame({
+        "Department": _data.df["Department"].to_numpy()[idx],
+        "Budget": latest[idx],
+    })
+
 
+@st.cache_data
+def csv_bytes(file_hash, _data, lo_idx, hi_idx):
+    """Long-format CSV download for year columns lo_idx..hi_idx."""
+    year_slice = slice(lo_idx, hi_idx + 1)
+    filtered_long = long_frame(
+        _data.df["Department"], _data.year_cols[year_slice], _data.mat[:, year_slice]
+    )
+    return filtered_long.to_csv(index=False).encode("utf-8")
 
-def compute_growth(row, year_cols):
-    """Compute simple growth metrics for a department."""
-    values = row[year_cols].values.astype(float)
-    start = values[0]
-    end = values[-1]
-    absolute_change = end - start
-    pct_change = (absolute_change / start * 100) if start != 0 else None
-    return start, end, absolute_change, pct_change
 
+warm_up_kernels()
 
 # ---------- SIDEBAR: DATA INPUT ----------
 st.sidebar.title("⚙️ Controls")
@@ -63,9 +236,10 @@ if uploaded is None:
     st.stop()
 
 # Load data from uploaded file
-df, long_df, year_cols = load_data(uploaded)
+data = load_data(uploaded)
+file_hash = hashlib.md5(uploaded.getvalue()).hexdigest()
 
-min_year, max_year = min(year_cols), max(year_cols)
+min_year, max_year = data.years[0], data.years[-1]
 
 year_range = st.sidebar.slider(
     "Select Year Range",
@@ -75,9 +249,13 @@ year_range = st.sidebar.slider(
     step=1
 )
 
-# filter by selected years
-selected_years = [str(y) for y in range(year_range[0], year_range[1] + 1)]
-filtered_long = long_df[long_df["Year"].isin(selected_years)]
+# filter by selected years; bounds missing from the CSV snap to the
+# nearest year inside the range
+lo_idx = int(np.searchsorted(data.years, year_range[0], side="left"))
+hi_idx = int(np.searchsorted(data.years, year_range[1], side="right")) - 1
+if lo_idx > hi_idx:
+    st.warning("No data for the selected year range.")
+    st.stop()
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("Dashboard features:")
@@ -98,24 +276,27 @@ st.caption(
 )
 
 # ---------- TABS ----------
+# Each tab body is a fragment, so its own widgets only rerun that tab.
 tab_overview, tab_dept, tab_compare, tab_info = st.tabs(
     ["📈 Overview", "🏛 Department Analysis", "⚖️ Comparison", "ℹ️ About Budget"]
 )
 
 # ---------- OVERVIEW TAB ----------
-with tab_overview:
+@st.fragment
+def render_overview(data, file_hash, lo_idx, hi_idx):
     st.subheader("Overall Budget Trends")
 
+    year_slice = slice(lo_idx, hi_idx + 1)
+    selected_years = data.year_cols[year_slice]
+
     # total budget per year
-    total_by_year = (
-        filtered_long.groupby("Year", as_index=False)["Budget"].sum()
-        .sort_values("Year")
-    )
+    totals = data.totals[year_slice]
+    total_by_year = pd.DataFrame({"Year": selected_years, "Budget": totals})
 
     col1, col2, col3, col4 = st.columns(4)
 
-    total_budget_latest = total_by_year[total_by_year["Year"] == max(selected_years)]["Budget"].iloc[0]
-    total_budget_first = total_by_year[total_by_year["Year"] == min(selected_years)]["Budget"].iloc[0]
+    total_budget_first = float(totals[0])
+    total_budget_latest = float(totals[-1])
     abs_change = total_budget_latest - total_budget_first
     pct_change = abs_change / total_budget_first * 100 if total_budget_first != 0 else 0
 
@@ -123,68 +304,48 @@ with tab_overview:
     col2.metric("Latest Year Total Budget (₹ Cr)", f"{total_budget_latest:,.0f}",
                 f"{abs_change:,.0f}")
     col3.metric("Growth (%)", f"{pct_change:,.1f}%")
-    col4.metric("No. of Departments", filtered_long["Department"].nunique())
+    col4.metric("No. of Departments", len(data.depts_sorted))
 
     st.markdown("### Total Budget by Year")
-    line = (
-        alt.Chart(total_by_year)
-        .mark_line(point=True)
-        .encode(
-            x="Year:O",
-            y=alt.Y("Budget:Q", title="Budget (₹ Crores)"),
-            tooltip=["Year", alt.Tooltip("Budget:Q", format=",.0f")],
-        )
-        .properties(height=350)
-    )
-    st.altair_chart(line, use_container_width=True)
+    st.vega_lite_chart(total_by_year, YEAR_LINE_SPEC, use_container_width=True)
 
     st.markdown("### Top 5 Departments – Latest Year")
-    latest_year_df = filtered_long[filtered_long["Year"] == max(selected_years)]
-    top5 = (
-        latest_year_df.groupby("Department", as_index=False)["Budget"]
-        .sum()
-        .sort_values("Budget", ascending=False)
-        .head(5)
-    )
-    bar = (
-        alt.Chart(top5)
-        .mark_bar()
-        .encode(
-            x=alt.X("Budget:Q", title="Budget (₹ Crores)"),
-            y=alt.Y("Department:N", sort="-x"),
-            tooltip=["Department", alt.Tooltip("Budget:Q", format=",.0f")],
-        )
-        .properties(height=300)
-    )
-    st.altair_chart(bar, use_container_width=True)
+    top5 = top5_latest(file_hash, data, hi_idx)
+    st.vega_lite_chart(top5, TOP5_BAR_SPEC, use_container_width=True)
 
     with st.expander("📥 Download current data (filtered years)"):
         st.download_button(
             label="Download CSV",
-            data=filtered_long.to_csv(index=False).encode("utf-8"),
+            data=csv_bytes(file_hash, data, lo_idx, hi_idx),
             file_name="filtered_budget_data.csv",
             mime="text/csv",
         )
 
+
+with tab_overview:
+    render_overview(data, file_hash, lo_idx, hi_idx)
+
 # ---------- DEPARTMENT ANALYSIS TAB ----------
-with tab_dept:
+@st.fragment
+def render_department(data, lo_idx, hi_idx):
     st.subheader("Department-wise Budget Analysis")
 
+    year_slice = slice(lo_idx, hi_idx + 1)
+    selected_years = data.year_cols[year_slice]
+
     dept = st.selectbox(
         "Select Department",
-        options=sorted(filtered_long["Department"].unique()),
+        options=data.depts_sorted,
     )
 
-    dept_data_wide = df[df["Department"] == dept].copy()
-    dept_long = filtered_long[filtered_long["Department"] == dept].copy()
-    dept_long = dept_long.sort_values("Year")
+    dept_pos = data.dept_idx[dept]
+    dept_long = long_frame([dept], selected_years, data.mat[[dept_pos], year_slice])
 
     col_a, col_b = st.columns(2)
     st.markdown(f"### {dept}")
 
     # growth metrics using full year_cols (not only filtered)
-    row = dept_data_wide.set_index("Department").loc[dept]
-    start, end, abs_change, pct_change = compute_growth(row, year_cols)
+    start, end, abs_change, pct_change = data.growth[dept]
 
     col_a.metric(
         "First Year Budget (₹ Cr)",
@@ -193,79 +354,66 @@ with tab_dept:
     col_b.metric(
         "Latest Year Budget (₹ Cr)",
         f"{end:,.0f}",
-        f"{abs_change:,.0f} ({pct_change:,.1f}%)" if pct_change is not None else "N/A",
+        f"{abs_change:,.0f} ({pct_change:,.1f}%)" if not np.isnan(pct_change) else "N/A",
     )
 
     c1, c2 = st.columns(2)
 
     with c1:
         st.markdown("#### Bar Chart")
-        bar_dept = (
-            alt.Chart(dept_long)
-            .mark_bar()
-            .encode(
-                x="Year:O",
-                y=alt.Y("Budget:Q", title="Budget (₹ Crores)"),
-                tooltip=["Year", alt.Tooltip("Budget:Q", format=",.0f")],
-            )
-            .properties(height=350)
-        )
-        st.altair_chart(bar_dept, use_container_width=True)
+        st.vega_lite_chart(dept_long, YEAR_BAR_SPEC, use_container_width=True)
 
     with c2:
         st.markdown("#### Line Chart")
-        line_dept = (
-            alt.Chart(dept_long)
-            .mark_line(point=True)
-            .encode(
-                x="Year:O",
-                y=alt.Y("Budget:Q", title="Budget (₹ Crores)"),
-                tooltip=["Year", alt.Tooltip("Budget:Q", format=",.0f")],
-            )
-            .properties(height=350)
-        )
-        st.altair_chart(line_dept, use_container_width=True)
+        st.vega_lite_chart(dept_long, YEAR_LINE_SPEC, use_container_width=True)
 
     st.markdown("#### Data Table")
     st.dataframe(
-        dept_data_wide.set_index("Department").T.rename(columns={dept: "Budget (₹ Cr)"}),
+        pd.DataFrame(data.dept_rows[dept], columns=["Year", "Budget (₹ Cr)"]),
         use_container_width=True,
+        hide_index=True,
     )
 
+
+with tab_dept:
+    render_department(data, lo_idx, hi_idx)
+
 # ---------- COMPARISON TAB ----------
-with tab_compare:
+@st.fragment
+def render_comparison(data, lo_idx, hi_idx):
     st.subheader("Compare Multiple Departments")
 
+    year_slice = slice(lo_idx, hi_idx + 1)
+    selected_years = data.year_cols[year_slice]
+
     multi_depts = st.multiselect(
         "Select Departments to Compare",
-        options=sorted(filtered_long["Department"].unique()),
-        default=sorted(filtered_long["Department"].unique())[:3],
+        options=data.depts_sorted,
+        default=data.depts_sorted[:3],
     )
 
     if multi_depts:
-        compare_df = filtered_long[filtered_long["Department"].isin(multi_depts)]
-        line_multi = (
-            alt.Chart(compare_df)
-            .mark_line(point=True)
-            .encode(
-                x="Year:O",
-                y=alt.Y("Budget:Q", title="Budget (₹ Crores)"),
-                color="Department:N",
-                tooltip=["Department", "Year", alt.Tooltip("Budget:Q", format=",.0f")],
-            )
-            .properties(height=400)
-        )
-        st.altair_chart(line_multi, use_container_width=True)
+        sel = [data.dept_idx[d] for d in multi_depts]
+        compare_df = long_frame(multi_depts, selected_years, data.mat[sel, year_slice])
+        st.vega_lite_chart(compare_df, COMPARE_LINE_SPEC, use_container_width=True)
 
         st.markdown("#### Summary Table (Latest Year)")
-        latest = compare_df[compare_df["Year"] == max(selected_years)]
-        latest_pivot = latest.pivot_table(
-            index="Department", values="Budget", aggfunc="sum"
-        ).sort_values("Budget", ascending=False)
+        latest_pivot = (
+            pd.DataFrame(
+                {"Budget": data.mat[sel, hi_idx]},
+                index=pd.Index(multi_depts, name="Department"),
+            )
+            .dropna()
+            .sort_values("Budget", ascending=False)
+        )
         st.dataframe(latest_pivot, use_container_width=True)
     else:
         st.info("Select at least one department to see comparison.")
 
+
+with tab_compare:
+    render_comparison(data, lo_idx, hi_idx)
+
 # ---------- ABOUT TAB ----------
 with tab_info:
     st.subheader("About This Budget Dashboard")
@@ -290,4 +438,4 @@ You can:
     )
 
     st.markdown("#### Raw Data Preview")
-    st.dataframe(df, use_container_width=True)
+    st.dataframe(data.df, use_container_width=True)